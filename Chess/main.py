@@ -1,109 +1,357 @@
+import multiprocessing
+import os
+from array import array
+
 import chess
+import chess.polyglot
 
 
 INFINITY = float("inf")
 
-piece_value = {
-    chess.PAWN: 1,
-    chess.KNIGHT: 3,
-    chess.BISHOP: 3,
-    chess.ROOK: 5,
-    chess.QUEEN: 9,
-    chess.KING: 0
-}
+# Score of being checkmated. It is finite, so a search window bounded by a mate score still has room for a null window
+# above it; MAX_SCORE lies beyond every reachable score and bounds the full window.
+MATE = 10 ** 6
+MAX_SCORE = 2 * MATE
+
+# Print the AIs' progress and every board they look at
+DEBUG = False
+
+# Transposition table entry flags
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maximum number of captures the quiescence search follows past the depth limit
+QUIESCENCE_DEPTH = 4
+
+# How many plies shallower than the node the null-move search looks
+NULL_MOVE_REDUCTION = 2
+
+# Split the root moves of searches at least PARALLEL_DEPTH deep across worker processes. Off by default: it has not
+# yet been shown to beat the serial search on wall-clock time, so only enable it after benchmarking it.
+PARALLEL = False
+PARALLEL_DEPTH = 4
+_pool = None
 
+# Fixed-size transposition table in flat arrays, indexed by the low bits of the Zobrist hash. TT_META packs the move
+# (from square | to square << 6 | promotion << 12, 0 for none), the flag (<< 15) and the depth (<< 17) of each entry.
+TT_SIZE = 2 ** 20
+TT_KEYS = array("Q", [0]) * TT_SIZE
+TT_VALUES = array("f", [0.0]) * TT_SIZE
+TT_META = array("I", [0]) * TT_SIZE
 
-def evaluate_board(board):
+# (score, best_move) results of find_best_move keyed by (Zobrist hash, depth)
+BEST_MOVE_CACHE_SIZE = 2 ** 18
+_BEST_MOVE_CACHE = {}
+
+# Piece values indexed by piece type, chess.PAWN (1) through chess.KING (6)
+_PVAL = (0, 1, 3, 3, 5, 9, 0)
+
+def evaluate_board(board, _popcount=chess.popcount, _white=chess.WHITE, _black=chess.BLACK, _pval=_PVAL):
     """
     Evaluate the board state and return a score.
+    Pieces are counted straight from the board's bitboards with popcounts, so no SquareSet or piece map is built. This
+    runs at every leaf, so the module attributes it needs are bound as default arguments, which are plain local reads
+    inside the function; they are not meant to be passed.
     """
-    score = 0
-    for piece in chess.PIECE_TYPES:
-        score += (len(board.pieces(piece, chess.BLACK)) - len(board.pieces(piece, chess.WHITE))) * 10
+    white = board.occupied_co[_white]
+    black = board.occupied_co[_black]
 
-    # Calculate material value
+    # Calculate material value, piece types 1 to 5 are chess.PAWN to chess.QUEEN
     material_value = 0
-    for square, piece in board.piece_map().items():
-        if piece.color == chess.WHITE:
-            material_value += piece_value[piece.piece_type]
-        elif piece.color == chess.BLACK:
-            material_value -= piece_value[piece.piece_type]
+    bitboards = (None, board.pawns, board.knights, board.bishops, board.rooks, board.queens)
+    for piece_type in range(1, 6):
+        bitboard = bitboards[piece_type]
+        material_value += _pval[piece_type] * (_popcount(bitboard & white) - _popcount(bitboard & black))
 
-    score += material_value
-    return score
+    # Count every piece except the kings
+    kings = board.kings
+    score = (_popcount(black & ~kings) - _popcount(white & ~kings)) * 10
+    return score + material_value
 
 
-def minimax(board, depth, alpha, beta, maximizing_player):
+def mvv_lva(board, move):
+    """
+    Score a capture by Most-Valuable-Victim / Least-Valuable-Attacker: taking a queen with a pawn scores highest, taking
+    a pawn with a queen lowest. Non-captures score 0.
     """
-    The function minimax(board, depth, alpha, beta, maximizing_player) is an implementation of the Minimax algorithm
-    with alpha-beta pruning for a two-player, perfect-information game. The algorithm is used to determine the best move
-    for a player given a current state of the game represented by the board object.
+    if not board.is_capture(move):
+        return 0
+    if board.is_en_passant(move):
+        victim = chess.PAWN
+    else:
+        victim = board.piece_type_at(move.to_square)
+    return 10 * _PVAL[victim] - _PVAL[board.piece_type_at(move.from_square)]
+
+
+def ordered_moves(board, tt_move, depth):
+    """
+    Return the legal moves of the board in the order the search should try them: the transposition table move first,
+    then captures by MVV-LVA, then checks, then the remaining quiet moves. Ordering only pays off when the children
+    have children of their own, so one ply above the leaves only the transposition table move is moved to the front.
+    """
+    moves = list(board.legal_moves)
+    if depth == 1:
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    moves.sort(key=lambda move: (-(move == tt_move), -mvv_lva(board, move), -board.gives_check(move)))
+    return moves
+
+
+def tt_probe(key):
+    """
+    Look up the board with Zobrist hash key in the transposition table and return its (depth, value, flag, move)
+    entry, or None if the slot holds another position.
+    """
+    index = key & (TT_SIZE - 1)
+    if TT_KEYS[index] != key:
+        return None
+    meta = TT_META[index]
+    encoded_move = meta & 0x7FFF
+    if encoded_move:
+        move = chess.Move(encoded_move & 63, (encoded_move >> 6) & 63, (encoded_move >> 12) or None)
+    else:
+        move = None
+    return meta >> 17, TT_VALUES[index], (meta >> 15) & 3, move
+
+
+def tt_store(key, depth, value, flag, move):
+    """
+    Store a search result in the transposition table under the board's Zobrist hash, replacing whatever position held
+    its slot before.
+    """
+    index = key & (TT_SIZE - 1)
+    meta = depth << 17 | flag << 15
+    if move is not None:
+        meta |= move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+    TT_KEYS[index] = key
+    TT_VALUES[index] = value
+    TT_META[index] = meta
+
+
+def quiescence(board, alpha, beta, color, depth=QUIESCENCE_DEPTH):
+    """
+    Extend the search past the depth limit through captures only, until the position is quiet, so a leaf is never
+    evaluated in the middle of an exchange. The side to move may "stand pat" on the static evaluation instead of
+    capturing. color is 1 when black (the maximizing player) is to move and -1 when white is, and the score is returned
+    from the side to move's point of view, clamped to the [alpha, beta] window. Every capture gains material under
+    evaluate_board, so capture chains run long; depth caps how many captures are followed.
+    """
+    stand_pat = color * evaluate_board(board)
+    if stand_pat >= beta:
+        return beta
+    alpha = max(alpha, stand_pat)
+    if depth == 0:
+        return alpha
+
+    captures = sorted(board.generate_legal_captures(), key=lambda move: mvv_lva(board, move), reverse=True)
+    push, pop = board.push, board.pop
+    for move in captures:
+        push(move)
+        score = -quiescence(board, -beta, -alpha, -color, depth - 1)
+        pop()
+
+        if score >= beta:
+            return beta
+        alpha = max(alpha, score)
+    return alpha
+
+
+def has_non_pawn_material(board):
+    """
+    Return True if the player to move has a piece other than pawns and the king. Without one, zugzwang is common and
+    passing the turn is not a safe lower bound, so null-move pruning is skipped.
+    """
+    return bool((board.knights | board.bishops | board.rooks | board.queens) & board.occupied_co[board.turn])
+
+
+def negamax(board, depth, alpha, beta, color,
+            _zobrist_hash=chess.polyglot.zobrist_hash, _null_move=chess.Move.null()):
+    """
+    The function negamax(board, depth, alpha, beta, color) is an implementation of the Minimax algorithm with alpha-beta
+    pruning in its negamax form, for a two-player, zero-sum, perfect-information game. The algorithm is used to
+    determine the best move for a player given a current state of the game represented by the board object.
     The input parameters of the function are:
     board: an object representing the current state of the game.
     depth: an integer representing the search depth. The search will end when this depth is reached or when the game is
     over.
-    alpha: a value representing the best value that the maximizing player is assured of.
-    beta: a value representing the best value that the minimizing player is assured of.
-    maximizing_player: a boolean indicating whether the current player is the maximizing player (True) or the minimizing
-    player (False).
+    alpha: a value representing the best value that the player to move is assured of.
+    beta: a value representing the best value that the opponent is assured of, from the point of view of the player to
+    move.
+    color: 1 if the player to move is black (the maximizing player of evaluate_board) and -1 if it is white.
+    _zobrist_hash and _null_move are not meant to be passed: binding them as default arguments turns the module
+    attribute lookups on every node into local reads.
     The function returns a tuple (value, best_move):
-    value: the best value for the current player. For the maximizing player, this is the maximum value found among all
-    possible moves. For the minimizing player, this is the minimum value found among all possible moves.
-    best_move: the move that results in the best value for the current player.
-    The algorithm works by recursively exploring the game tree, alternating between maximizing and minimizing players,
-    and using the alpha and beta values to prune the search tree. At each node in the tree, the function first checks if
-    the search depth has been reached or if the game is over, in which case it returns the evaluation of the board with
-    the evaluate_board function. If the current player is the maximizing player, the function loops through all legal
-    moves and updates the alpha value and best_move if a move results in a better score. If the alpha value is greater
-    than or equal to beta, the search can be stopped as the minimizing player is guaranteed to not choose a move that
-    results in a lower score. If the current player is the minimizing player, the function works similarly, but updates
-    the beta value instead of alpha. The function returns the updated beta value and the corresponding best move.
+    value: the best value for the player to move, from that player's point of view.
+    best_move: the move that results in the best value for the player to move.
+    Because the game is zero-sum, a position's value for one player is the negation of its value for the other, so a
+    single branch serves both players: each child is searched with the window negated and swapped and its value
+    negated. At each node the function first checks if the search depth has been reached, in which case the quiescence
+    function keeps searching captures until the position is quiet. Otherwise it generates the legal moves; a position
+    without any is checkmate (-MATE for the player to move, lower the closer to the root) or stalemate (0). The full
+    board.is_game_over() test is not run at every node, as it generates the legal moves again. The function loops
+    through the legal moves using Principal Variation Search: the first move is searched with the full window, and
+    every other move with a null window that only proves it is no better than the first one. A move that fails that
+    proof is searched again with the full window. The alpha value and best_move are updated when a move results in a
+    better score, and the search stops as soon as alpha is greater than or equal to beta, as the opponent will never
+    allow this position.
+    Before the moves are searched, null-move pruning gives the opponent a free move in null-window nodes; if a shallower
+    search still fails high, the node is cut off without searching its moves.
     The running time of this implementation of the Minimax algorithm with alpha-beta pruning depends on the size of the
     game tree and the time required to evaluate each board. In the worst case, the size of the game tree is exponential
     in the search depth, which means that the running time can be very large. However, the use of alpha-beta pruning can
     significantly reduce the number of nodes that need to be evaluated, making the algorithm much more efficient in
     practice.
     """
-    try:
-        if depth == 0 or board.is_game_over():
-            return evaluate_board(board), None
-
-        best_score = float('-inf') if maximizing_player else float('inf')
-        best_move = None
-
-        if maximizing_player:
-            alpha = -INFINITY
-            for move in board.legal_moves:
-                board.push(move)
-                score, _ = minimax(board, depth - 1, alpha, beta, False)
-                board.pop()
-
-                if score > best_score:
-                    best_score, best_move = score, move
-                    alpha = max(alpha, score)
-                    if alpha >= beta:
-                        break
+    if depth == 0:
+        return quiescence(board, alpha, beta, color), None
+
+    key = _zobrist_hash(board)
+    entry = tt_probe(key)
+    if entry is not None and entry[0] >= depth:
+        _, value, flag, move = entry
+        if flag == EXACT:
+            return value, move
+        elif flag == LOWER:
+            alpha = max(alpha, value)
+        elif flag == UPPER:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value, move
+    alpha_orig, beta_orig = alpha, beta
+
+    # Null-move pruning: let the opponent move twice in a row. If a reduced search still fails high, a real move would
+    # too. Only tried in null-window nodes, never twice in a row and never in check, where passing is illegal.
+    if (depth >= 3 and beta - alpha == 1 and (not board.move_stack or board.move_stack[-1])
+            and not board.is_check() and has_non_pawn_material(board)):
+        board.push(_null_move)
+        score = -negamax(board, depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + 1, -color)[0]
+        board.pop()
+        if score >= beta:
+            return beta, None
+
+    best_score = -MAX_SCORE
+    best_move = None
+
+    tt_move = entry[3] if entry is not None else None
+    moves = ordered_moves(board, tt_move, depth)
+    if not moves:
+        # Checkmate or stalemate, the move generation above already had to find that out. A mate closer to the root,
+        # with more depth left, scores lower, so the winning side prefers the fastest mate.
+        return (-(MATE + depth) if board.is_check() else 0), None
+    # Bind the board methods once per node instead of looking them up on every move
+    push, pop = board.push, board.pop
+
+    for i, move in enumerate(moves):
+        push(move)
+        if i == 0:
+            score = -negamax(board, depth - 1, -beta, -alpha, -color)[0]
         else:
-            beta = INFINITY
-            for move in board.legal_moves:
-                board.push(move)
-                score, _ = minimax(board, depth - 1, alpha, beta, True)
-                board.pop()
-
-                if score < best_score:
-                    best_score, best_move = score, move
-                    beta = min(beta, score)
-                    if alpha >= beta:
-                        break
-
-        return best_score, best_move
-    except Exception as e:
-        print("An error occurred:", e)
-        return None, None
+            score = -negamax(board, depth - 1, -alpha - 1, -alpha, -color)[0]
+            if alpha < score < beta:
+                score = -negamax(board, depth - 1, -beta, -score, -color)[0]
+        pop()
+
+        if best_move is None or score > best_score:
+            best_score, best_move = score, move
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+
+    if best_score <= alpha_orig:
+        flag = UPPER
+    elif best_score >= beta_orig:
+        flag = LOWER
+    else:
+        flag = EXACT
+    tt_store(key, depth, best_score, flag, best_move)
+
+    return best_score, best_move
+
+
+def _search_root(fen, uci, depth, alpha, beta):
+    """
+    Worker entry point of the parallel root search. Rebuild the board from its FEN, play the root move given in UCI
+    notation and search the resulting position inside the root's (alpha, beta) window. Returns (score, key, entry):
+    the score from the root player's point of view, and the Zobrist hash and transposition table entry of the searched
+    position, for the parent to store in its own table.
+    """
+    board = chess.Board(fen)
+    color = 1 if board.turn == chess.BLACK else -1
+    board.push(chess.Move.from_uci(uci))
+    score, _ = negamax(board, depth, -beta, -alpha, -color)
+    key = chess.polyglot.zobrist_hash(board)
+    return -score, key, tt_probe(key)
+
+
+def _get_pool():
+    """
+    Return the worker pool of the parallel root search, starting it on first use. The pool is reused for the rest of
+    the game, so each worker keeps its own transposition table from one move to the next.
+    """
+    global _pool
+    if _pool is None:
+        _pool = multiprocessing.Pool(os.cpu_count() or 1)
+    return _pool
+
+
+def close_pool():
+    """
+    Shut down the worker pool of the parallel root search, if it was started.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool.join()
+        _pool = None
+
+
+def parallel_root_search(board, depth):
+    """
+    Principal Variation Search split at the root, returning (score, best_move) with the score from the point of view of
+    the player to move, like negamax. The first move in the ordering is searched here with the full window, which sets
+    the bound every other move has to beat. The remaining moves are handed to the worker processes with a null window
+    at that bound, so each of them only proves that it is no better; the few moves that fail high are searched again
+    here with the full window. The transposition table entry of every position the workers searched is copied into
+    this process's table, so later searches start from it.
+    Workers keep their own tables between moves. With the fork start method they start from a copy of this process's
+    table as it was when the pool was created; under spawn or forkserver they start with an empty table.
+    """
+    color = 1 if board.turn == chess.BLACK else -1
+    key = chess.polyglot.zobrist_hash(board)
+    entry = tt_probe(key)
+    root_moves = ordered_moves(board, entry[3] if entry is not None else None, depth)
+
+    best_move = root_moves[0]
+    board.push(best_move)
+    best_score = -negamax(board, depth - 1, -MAX_SCORE, MAX_SCORE, -color)[0]
+    board.pop()
+
+    fen = board.fen()
+    args = [(fen, move.uci(), depth - 1, best_score, best_score + 1) for move in root_moves[1:]]
+    results = _get_pool().starmap(_search_root, args)
+
+    for move, (score, child_key, child_entry) in zip(root_moves[1:], results):
+        if child_entry is not None:
+            tt_store(child_key, *child_entry)
+        if score > best_score:
+            # The move beat the bound it was searched with, find out by how much
+            board.push(move)
+            score = -negamax(board, depth - 1, -MAX_SCORE, -best_score, -color)[0]
+            board.pop()
+            if score > best_score:
+                best_score, best_move = score, move
+
+    tt_store(key, depth, best_score, EXACT, best_move)
+    return best_score, best_move
+
 
 def find_best_move(board, depth):
     """
-    The function find_best_move(board, depth) is a wrapper function for the minimax function, which implements the
+    The function find_best_move(board, depth) is a wrapper function for the negamax function, which implements the
     Minimax algorithm with alpha-beta pruning for a two-player, perfect-information game. The function is used to find
     the best move for a player given a current state of the game represented by the board object.
     The input parameters of the function are:
@@ -111,89 +359,119 @@ def find_best_move(board, depth):
     depth: an integer representing the search depth. The search will end when this depth is reached or when the game is
     over.
     The function returns (value, best_move):
-    value: the best value for the current player. For the maximizing player, this is the maximum value found among all
-    possible moves. For the minimizing player, this is the minimum value found among all possible moves.
+    value: the best value found for the current player, from black's point of view: black is the maximizing player and
+    white the minimizing player.
     best_move: the move that results in the best value for the current player.
-    The function first checks the color of the player to move (board.turn) and sets the maximizing_player value
-    accordingly, with black being the maximizing player and white being the minimizing player. The alpha and beta values
-    are then initialized based on the maximizing_player value, with alpha set to negative infinity for the maximizing
-    player and positive infinity for the minimizing player, and beta set to positive infinity for the maximizing player
-    and negative infinity for the minimizing player. The minimax function is then called with the board, depth, alpha,
-    beta, and maximizing_player values as inputs. The function returns the output of the minimax function, which is the
-    best value and move found by the algorithm.
+    The function first checks the color of the player to move (board.turn) and sets the color value accordingly, 1 for
+    black and -1 for white. The search starts with the full window, alpha set to -MAX_SCORE and beta set to MAX_SCORE.
+    The negamax function is then called with the board, depth, alpha, beta, and color values as inputs, using iterative
+    deepening: the search is repeated for every depth from 1 up to the requested depth, and each iteration leaves its
+    best moves in the transposition table so the next, deeper iteration searches them first. When PARALLEL is set, the
+    final iteration is at least PARALLEL_DEPTH deep and more than one core is available, its root moves are searched in
+    parallel by parallel_root_search. Finished results are also kept in _BEST_MOVE_CACHE, so a position that comes up
+    again at the same depth is answered without searching. The function returns the output of the last iteration,
+    converted back to black's point of view, which is the best value and move found by the algorithm.
     The running time of this implementation of the Minimax algorithm with alpha-beta pruning depends on the size of the
     game tree and the time required to evaluate each board. In the worst case, the size of the game tree is exponential
     in the search depth, which means that the running time can be very large. However, the use of alpha-beta pruning can
     significantly reduce the number of nodes that need to be evaluated, making the algorithm much more efficient in
     practice.
     """
-    if board.turn == chess.BLACK:
-        maximizing_player = True
-        alpha = -INFINITY
-        beta = INFINITY
-    else:
-        maximizing_player = False
-        alpha = INFINITY
-        beta = -INFINITY
+    key = (chess.polyglot.zobrist_hash(board), depth)
+    if key in _BEST_MOVE_CACHE:
+        return _BEST_MOVE_CACHE[key]
 
-    score, best_move = minimax(board, depth, alpha, beta, maximizing_player)
+    color = 1 if board.turn == chess.BLACK else -1
+    alpha = -MAX_SCORE
+    beta = MAX_SCORE
 
-    if best_move is None and board.is_checkmate():
-        if board.turn == chess.WHITE:
-            score = -INFINITY
-        else:
-            score = INFINITY
-        return score, None
+    score, best_move = None, None
+    try:
+        for current_depth in range(1, depth + 1):
+            if (PARALLEL and current_depth == depth >= PARALLEL_DEPTH and (os.cpu_count() or 1) > 1
+                    and board.legal_moves.count() > 1):
+                score, best_move = parallel_root_search(board, current_depth)
+            else:
+                score, best_move = negamax(board, current_depth, alpha, beta, color)
+    except Exception as e:
+        print("An error occurred:", e)
+        return None, None
+    # negamax scores from the point of view of the player to move, callers expect black's point of view
+    score = color * score
 
+    if len(_BEST_MOVE_CACHE) >= BEST_MOVE_CACHE_SIZE:
+        del _BEST_MOVE_CACHE[next(iter(_BEST_MOVE_CACHE))]
+    _BEST_MOVE_CACHE[key] = score, best_move
     return score, best_move
 
 
-def play_chess(fen, black_count, white_count):
+def find_mate_in_one(board):
+    """
+    Return a move that checkmates the opponent right away, or None if there is none. Only a checking move can mate, so
+    the full checkmate test only runs after the move passed the cheaper gives_check test.
+    """
+    for move in board.legal_moves:
+        if board.gives_check(move):
+            board.push(move)
+            is_mate = board.is_checkmate()
+            board.pop()
+            if is_mate:
+                return move
+    return None
+
+
+def play_chess(board, black_count, white_count):
     """
-    Play chess using the Chess AI.
-    The time complexity of the minimax function is O(b^d), where b is the number of legal moves available in a given
+    Play chess using the Chess AI, starting from board, a chess.Board, which is played on in place.
+    The time complexity of the negamax function is O(b^d), where b is the number of legal moves available in a given
     state, and d is the search depth. In each recursive call, the function will visit all of the legal moves and will
-    recursively call the minimax function for each of them. The search will continue until the search depth is reached,
-    or the game has ended. The find_best_move function has the same time complexity as the minimax function because it
-    simply calls minimax with the specified search depth. The play_chess function has a time complexity of O(n * b^d),
+    recursively call the negamax function for each of them. The search will continue until the search depth is reached,
+    or the game has ended. The find_best_move function has the same time complexity as the negamax function because it
+    simply calls negamax with the specified search depth. The play_chess function has a time complexity of O(n * b^d),
     where n is the number of FEN boards in the input file. This is because the function will play each board one by one
     and will call find_best_move for each board.
-    The space complexity of the minimax function is O(d), where d is the search depth. In each recursive call, the
+    The space complexity of the negamax function is O(d), where d is the search depth. In each recursive call, the
     function will use a constant amount of memory to store variables such as alpha, beta, and best_move. The maximum
     number of calls that can occur is equal to the search depth, so the space complexity is O(d). The find_best_move
-    function has the same space complexity as the minimax function because it simply calls minimax with the specified
+    function has the same space complexity as the negamax function because it simply calls negamax with the specified
     search depth. The play_chess function has a space complexity of O(n * d), where n is the number of FEN boards in the
     input file. This is because the function will play each board one by one and will call find_best_move for each board,
     and find_best_move has a space complexity of O(d).
     """
-    board = chess.Board(fen)
-    depth = 5 # The search depth for minimax
+    depth = 5 # The search depth for negamax
 
     def black_ai(board, move_count):
-        print("BlackAI is thinking...")
-        print(board)
+        if DEBUG:
+            print("BlackAI is thinking...")
+            print(board)
         score, move = find_best_move(board, depth)
         if move is None:
-            print("BlackAI could not find a valid move.")
+            if DEBUG:
+                print("BlackAI could not find a valid move.")
             return score, None
         return score, move
 
     def white_ai(board, move_count):
-        print("WhiteAI is thinking...")
-        print(board)
+        if DEBUG:
+            print("WhiteAI is thinking...")
+            print(board)
         score, move = find_best_move(board, depth)
         if move is None:
-            print("WhiteAI could not find a valid move.")
+            if DEBUG:
+                print("WhiteAI could not find a valid move.")
             return score, None
         return score, move
 
     no_move_count = 0
-    while not board.is_game_over():
+    game_over = board.is_game_over()
+    while not game_over:
+        # A mate in one is played straight away instead of running the full search
+        mate = find_mate_in_one(board)
         if board.turn == chess.WHITE:
-            score, move = white_ai(board, no_move_count)
+            score, move = (-INFINITY, mate) if mate is not None else white_ai(board, no_move_count)
             white_count += 1
         else:
-            score, move = black_ai(board, no_move_count)
+            score, move = (INFINITY, mate) if mate is not None else black_ai(board, no_move_count)
             black_count += 1
 
         if move is None:
@@ -219,50 +497,62 @@ def play_chess(fen, black_count, white_count):
         print("Updated board:")
         print(board)
 
-        if board.is_checkmate():
+        # One termination test per move played, it tells checkmate and draws apart as well
+        outcome = board.outcome()
+        if outcome is None:
+            continue
+        game_over = True
+        if outcome.termination == chess.Termination.CHECKMATE:
             if board.turn == chess.WHITE:
                 print("Checkmate! Black AI wins. Total move count: {}".format(black_count))
             else:
                 print("Checkmate! White AI wins. Total move count: {}".format(white_count))
-            break
-
-        elif board.is_game_over():
+        else:
             print("Game over. It's a draw.")
-            break
     return black_count, white_count
 
-# Reading the text file with FEN boards
-with open("test.txt", "r") as file:
-    fens = file.readlines()
-
-index = 0
-black_count = 0
-white_count = 0
-games = 0
-# Playing each FEN board one by one
-for fen in fens:
-    fen = fen.strip()
-    if games == 0:
-        print("Loading Boards")
-    games += 1
-    if games > 1:
-        print("The game is over. End of current board, next board is starting.")
-    if games >= 1:
-        print("Playing board {}".format(games-1))
-
-    if chess.Board(fen).is_game_over():
-        print("The game is over. End of current board, next board is starting.")
-        print("Black AI move count:", black_count)
-        print("White AI move count:", white_count)
-        black_count = 0
-        white_count = 0
-        if black_count > white_count:
-            print("Black AI won the previous board.")
-        elif white_count > black_count:
-            print("White AI won the previous board.")
-        else:
-            print("The previous board was a draw.")
-    black_count, white_count = play_chess(fen, black_count, white_count)
+if __name__ == "__main__":
+    # Reading the text file with FEN boards
+    with open("test.txt", "r") as file:
+        fens = file.readlines()
+
+    # Parse every distinct FEN once, keeping the order of the file
+    boards = {}
+    for line in fens:
+        fen = line.strip()
+        if fen and fen not in boards:
+            boards[fen] = chess.Board(fen)
+
+    index = 0
+    black_count = 0
+    white_count = 0
+    games = 0
+    # Playing each FEN board one by one
+    for fen, board in boards.items():
+        if games == 0 and DEBUG:
+            print("Loading Boards")
+        games += 1
+        if games > 1 and DEBUG:
+            print("The game is over. End of current board, next board is starting.")
+        if games >= 1 and DEBUG:
+            print("Playing board {}".format(games-1))
+
+        if board.is_game_over():
+            if DEBUG:
+                print("The game is over. End of current board, next board is starting.")
+                print("Black AI move count:", black_count)
+                print("White AI move count:", white_count)
+            black_count = 0
+            white_count = 0
+            if DEBUG:
+                if black_count > white_count:
+                    print("Black AI won the previous board.")
+                elif white_count > black_count:
+                    print("White AI won the previous board.")
+                else:
+                    print("The previous board was a draw.")
+        black_count, white_count = play_chess(board, black_count, white_count)
+    close_pool()
 
 '''
 ANSWERS